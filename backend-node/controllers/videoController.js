@@ -33,6 +33,8 @@ const { saveAnalysisToInflux, waitForInfluxData, getPlayersDistanceAndAvgSpeed,
 const host = process.env.VIDEO_API_HOST;
 const port = process.env.VIDEO_API_PORT;
 const FLASK_FastAPI = `http://${host}:${port}`;
+// Nivel de detalle de la trayectoria devuelta por FastAPI ('native', '10hz' o '1hz')
+const lodLevel = process.env.VIDEO_LOD_LEVEL || 'native';
 
 
 
@@ -189,6 +191,7 @@ exports.uploadVideo = async (req, res) => {
     form.append('display_width', String(display_width));
     form.append('display_height', String(display_height));
     form.append('match_id', matchId);
+    form.append('lod_level', lodLevel);
 
     //console.log('Enviando a FastAPI:',{matchId})
 
@@ -219,6 +222,8 @@ exports.uploadVideo = async (req, res) => {
 
 /**
  * Procesa el resultado del análisis de vídeo, guarda estadísticas en Mongo e Influx.
+ * Si el resultado incluye `stats` (calculadas en Python) se guardan directamente;
+ * si no, se calculan con consultas a InfluxDB.
  *
  * @async
  * @function handleVideoResult
@@ -240,20 +245,36 @@ exports.handleVideoResult = async (req, res) => {
   // Comprobar que estan todos los puntos guardados
   const points = await saveAnalysisToInflux(result, matchId);
 
-  await waitForInfluxData(matchId, points);
-
-  // Calcular estadisticas
-  const { distances, avgSpeeds } = await getPlayersDistanceAndAvgSpeed(matchId);
-  const maxSpeeds = await getMaxSpeed(matchId);
-
-  // Calcular mapa de calor
-  const heatmapData = await getHeatmapData(matchId);
-
-  const analysis = {
-    distances,
-    avgSpeeds,
-    maxSpeeds
-  };
+  let analysis;
+  let heatmapData;
+
+  if (result.stats) {
+    // Estadisticas precalculadas por el worker de Python
+    const { distances, avgSpeeds, maxSpeeds, speedProfiles, bounces, heatmap } = result.stats;
+    analysis = {
+      distances,
+      avgSpeeds,
+      maxSpeeds,
+      speedProfiles,
+      bounces
+    };
+    heatmapData = heatmap;
+  } else {
+    await waitForInfluxData(matchId, points);
+
+    // Calcular estadisticas
+    const { distances, avgSpeeds } = await getPlayersDistanceAndAvgSpeed(matchId);
+    const maxSpeeds = await getMaxSpeed(matchId);
+
+    // Calcular mapa de calor
+    heatmapData = await getHeatmapData(matchId);
+
+    analysis = {
+      distances,
+      avgSpeeds,
+      maxSpeeds
+    };
+  }
     
   matchDoc.analysis = analysis;
   matchDoc.heatmap = heatmapData;
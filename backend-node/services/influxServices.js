@@ -29,9 +29,13 @@ const queryApi = influxDB.getQueryApi(influxOrg);
  *
  * @async 
  * @function saveAnalysisToInflux
- * @param   {Object} data         Objeto con FPS y array de frames.
- * @param   {number} data.fps     Frames por segundo del análisis.
- * @param   {Array}  data.frames  Array de frames con posición de jugadores y bola.
+ * Si los frames provienen de un nivel de detalle reducido, cada uno indica en `frame`
+ * su índice en el vídeo original y el timestamp se calcula con `source_fps`.
+ *
+ * @param   {Object} data               Objeto con FPS y array de frames.
+ * @param   {number} data.fps           Frames por segundo del análisis.
+ * @param   {number} [data.source_fps]  Frames por segundo del vídeo original.
+ * @param   {Array}  data.frames        Array de frames con posición de jugadores y bola.
  * @param   {string} matchId      ID del partido al que pertenecen los datos.
  * @returns {Promise<number>}     Número total de puntos escritos.
  */
@@ -39,7 +43,7 @@ async function saveAnalysisToInflux(data, matchId) {
 
   const writeApi = influxDB.getWriteApi(influxOrg, influxBucket, 'ms');
 
-  const fps = data.fps;
+  const fps = data.source_fps || data.fps;
   const frameIntervalMs = 1000 / fps;
   const startTime = Date.now() - 60 * 60 * 1000;
   let totalPoints = 0;
@@ -49,7 +53,8 @@ async function saveAnalysisToInflux(data, matchId) {
   try {
     for (let i = 0; i < data.frames.length; i++) {
       const frame     = data.frames[i];
-      const timestamp = new Date(startTime + i * frameIntervalMs);
+      const frameIdx  = frame.frame !== undefined ? frame.frame : i;
+      const timestamp = new Date(startTime + frameIdx * frameIntervalMs);
       //console.log(`  ↳ Frame ${i + 1}/${data.frames.length} @ ${timestamp.toISOString()}`);
 
       // Guardar la posición de los jugadores
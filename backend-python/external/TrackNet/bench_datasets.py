@@ -0,0 +1,45 @@
+import torch
+import time
+import argparse
+from datasets import trackNetDataset, trackNetMemmapDataset
+
+def benchmark(dataset, batch_size, num_workers, num_batches):
+    """ Measure data loading throughput of a dataset
+    :params
+        dataset: dataset to benchmark
+        batch_size: batch size
+        num_workers: number of data loading workers
+        num_batches: number of batches to read
+    :return
+        samples_per_sec: loaded samples per second
+    """
+    loader = torch.utils.data.DataLoader(
+        dataset,
+        batch_size=batch_size,
+        shuffle=True,
+        num_workers=num_workers,
+        pin_memory=False
+    )
+    samples = 0
+    start_time = time.time()
+    for iter_id, batch in enumerate(loader):
+        samples += len(batch[0])
+        if iter_id + 1 >= num_batches:
+            break
+    return samples / (time.time() - start_time)
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mode', type=str, default='val', help='train or val')
+    parser.add_argument('--batch_size', type=int, default=2, help='batch size')
+    parser.add_argument('--num_workers', type=int, nargs='+', default=[1, 4], help='numbers of workers to test')
+    parser.add_argument('--num_batches', type=int, default=200, help='number of batches per run')
+    args = parser.parse_args()
+
+    datasets = [('images', trackNetDataset(args.mode)), ('memmap', trackNetMemmapDataset(args.mode))]
+    for num_workers in args.num_workers:
+        for name, dataset in datasets:
+            samples_per_sec = benchmark(dataset, args.batch_size, num_workers, args.num_batches)
+            print('dataset = {}, num_workers = {}, samples/sec = {:.1f}'.format(name, num_workers,
+                                                                                 samples_per_sec))
@@ -55,3 +55,109 @@ class trackNetDataset(Dataset):
 
         imgs = np.rollaxis(imgs, 2, 0)
         return imgs
+
+
+def preprocess_dataset(mode, path_dataset='./datasets/trackNet', input_height=360, input_width=640):
+    """ Decode and resize every frame and ground truth of a split once and store them
+    in memory-mapped uint8 arrays, so trackNetMemmapDataset does not decode images.
+    :params
+        mode: 'train' or 'val'
+        path_dataset: path to the dataset folder with labels_{mode}.csv
+        input_height, input_width: size of the stored frames and label maps
+    :return
+        path_store: folder with the generated arrays
+    """
+    assert mode in ['train', 'val'], 'incorrect mode'
+    data = pd.read_csv(os.path.join(path_dataset, 'labels_{}.csv'.format(mode)))
+    path_store = os.path.join(path_dataset, 'memmap')
+    os.makedirs(path_store, exist_ok=True)
+
+    # every frame appears in up to three samples, so store each one only once
+    frame_paths = pd.unique(data[['path1', 'path2', 'path3']].values.ravel())
+    frame_ids = {path: i for i, path in enumerate(frame_paths)}
+
+    frames = np.lib.format.open_memmap(os.path.join(path_store, 'frames_{}.npy'.format(mode)), mode='w+',
+                                       dtype=np.uint8, shape=(len(frame_paths), input_height, input_width, 3))
+    for i, path in enumerate(frame_paths):
+        img = cv2.imread(os.path.join(path_dataset, path))
+        frames[i] = cv2.resize(img, (input_width, input_height))
+        if i % 1000 == 0:
+            print('mode = {}, frames = [{}|{}]'.format(mode, i, len(frame_paths)))
+    frames.flush()
+    del frames
+
+    gts = np.lib.format.open_memmap(os.path.join(path_store, 'gts_{}.npy'.format(mode)), mode='w+',
+                                    dtype=np.uint8, shape=(data.shape[0], input_height * input_width))
+    for i, path in enumerate(data['gt_path']):
+        img = cv2.imread(os.path.join(path_dataset, path))
+        img = cv2.resize(img, (input_width, input_height))
+        gts[i] = np.reshape(img[:, :, 0], (input_width * input_height))
+        if i % 1000 == 0:
+            print('mode = {}, gts = [{}|{}]'.format(mode, i, data.shape[0]))
+    gts.flush()
+    del gts
+
+    triplets = np.array([[frame_ids[p] for p in row] for row in data[['path1', 'path2', 'path3']].values],
+                        dtype=np.int64)
+    np.savez(os.path.join(path_store, 'index_{}.npz'.format(mode)),
+             triplets=triplets,
+             x=data['x-coordinate'].fillna(-1).values.astype(np.float64),
+             y=data['y-coordinate'].fillna(-1).values.astype(np.float64),
+             vis=data['visibility'].values.astype(np.int64))
+    print('mode = {}, stored {} frames for {} samples in {}'.format(mode, len(frame_paths), data.shape[0],
+                                                                    path_store))
+    return path_store
+
+
+class trackNetMemmapDataset(Dataset):
+    """ Same samples as trackNetDataset read from the arrays written by preprocess_dataset.
+    The 9-channel input is built from three rows of the shared frames array.
+    """
+    def __init__(self, mode, path_dataset='./datasets/trackNet'):
+        assert mode in ['train', 'val'], 'incorrect mode'
+        self.mode = mode
+        self.path_store = os.path.join(path_dataset, 'memmap')
+        index = np.load(os.path.join(self.path_store, 'index_{}.npz'.format(mode)))
+        self.triplets = index['triplets']
+        self.x = index['x']
+        self.y = index['y']
+        self.vis = index['vis']
+        # opened lazily so every DataLoader worker maps the files itself instead of pickling them
+        self.frames = None
+        self.gts = None
+        print('mode = {}, samples = {}'.format(mode, len(self.triplets)))
+
+    def __len__(self):
+        return len(self.triplets)
+
+    def _open(self):
+        self.frames = np.load(os.path.join(self.path_store, 'frames_{}.npy'.format(self.mode)), mmap_mode='r')
+        self.gts = np.load(os.path.join(self.path_store, 'gts_{}.npy'.format(self.mode)), mmap_mode='r')
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['frames'] = None
+        state['gts'] = None
+        return state
+
+    def __getitem__(self, idx):
+        if self.frames is None:
+            self._open()
+        # (3, H, W, 3) -> (9, H, W) with the same channel order as trackNetDataset.get_input
+        imgs = self.frames[self.triplets[idx]]
+        n, height, width, c = imgs.shape
+        imgs = imgs.transpose(0, 3, 1, 2).reshape(n * c, height, width)
+        imgs = imgs.astype(np.float32)/255.0
+        outputs = np.array(self.gts[idx])
+        return imgs, outputs, self.x[idx], self.y[idx], self.vis[idx]
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--path_dataset', type=str, default='./datasets/trackNet', help='path to dataset folder')
+    args = parser.parse_args()
+
+    for mode in ['train', 'val']:
+        preprocess_dataset(mode, args.path_dataset)
@@ -3,6 +3,7 @@ import pandas as pd
 import os
 import cv2
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 def gaussian_kernel(size, variance):
     x, y = np.mgrid[-size:size+1, -size:size+1]
@@ -48,8 +49,81 @@ def create_gt_images(path_input, path_output, size, variance, width, height):
 
                 cv2.imwrite(os.path.join(path_out_clip, file_name), heatmap) 
                 
+def paste_gaussian(heatmap, gaussian_kernel_array, x, y, size):
+    """ Paste gaussian kernel centered on (x, y) clipping it to the heatmap borders
+    :params
+        heatmap: 2D array where the kernel is pasted (modified in place)
+        gaussian_kernel_array: kernel returned by create_gaussian, indexed as [x_offset][y_offset]
+        x, y: center of the kernel in pixels
+        size: kernel radius
+    :return
+        heatmap: heatmap with the pasted kernel
+    """
+    height, width = heatmap.shape[:2]
+    x_min, x_max = max(x - size, 0), min(x + size + 1, width)
+    y_min, y_max = max(y - size, 0), min(y + size + 1, height)
+    if x_min >= x_max or y_min >= y_max:
+        return heatmap
+    # the kernel is indexed [i][j] with i as x offset, so transpose it to [row][col]
+    patch = gaussian_kernel_array.T[y_min - y + size:y_max - y + size, x_min - x + size:x_max - x + size]
+    heatmap[y_min:y_max, x_min:x_max] = patch
+    return heatmap
+
+def create_gt_clip(path_input, path_output, game, clip, gaussian_kernel_array, size, width, height,
+                   compression=3):
+    """ Write single-channel ground truth heatmaps for one clip
+    :params
+        path_input: path to the dataset folder with Label.csv files
+        path_output: path to the output folder
+        game, clip: names of the game and clip folders
+        gaussian_kernel_array: kernel returned by create_gaussian
+        size: kernel radius
+        width, height: size of the output heatmaps
+        compression: PNG compression level (0-9)
+    :return
+        num_frames: number of written heatmaps
+    """
+    path_out_clip = os.path.join(path_output, game, clip)
+    os.makedirs(path_out_clip, exist_ok=True)
+
+    labels = pd.read_csv(os.path.join(path_input, game, clip, 'Label.csv'))
+    params = [cv2.IMWRITE_PNG_COMPRESSION, compression]
+    for file_name, vis, x, y in labels.iloc[:, :4].itertuples(index=False):
+        heatmap = np.zeros((height, width), dtype=np.uint8)
+        if vis != 0:
+            paste_gaussian(heatmap, gaussian_kernel_array, int(x), int(y), size)
+        cv2.imwrite(os.path.join(path_out_clip, file_name), heatmap, params)
+    return labels.shape[0]
+
+def create_gt_images_fast(path_input, path_output, size, variance, width, height, num_workers=None):
+    """ Fast version of create_gt_images. Kernels are pasted with array slicing, heatmaps
+    are written as single-channel PNG (cv2.imread returns the same 3-channel image) and
+    clips are processed in a process pool.
+    :params
+        path_input: path to the dataset folder
+        path_output: path to the output folder
+        size: kernel radius
+        variance: kernel variance
+        width, height: size of the output heatmaps
+        num_workers: number of processes (None to use all cpus)
+    """
+    gaussian_kernel_array = create_gaussian(size, variance).astype(np.uint8)
+    jobs = []
+    for game_id in range(1,11):
+        game = 'game{}'.format(game_id)
+        for clip in os.listdir(os.path.join(path_input, game)):
+            jobs.append((game, clip))
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        futures = [executor.submit(create_gt_clip, path_input, path_output, game, clip,
+                                   gaussian_kernel_array, size, width, height)
+                   for game, clip in jobs]
+        for (game, clip), future in zip(jobs, futures):
+            num_frames = future.result()
+            print('game = {}, clip = {}, frames = {}'.format(game, clip, num_frames))
+
 def create_gt_labels(path_input, path_output, train_rate=0.7):
-    df = pd.DataFrame()
+    dfs = []
     for game_id in range(1,11):
         game = 'game{}'.format(game_id)
         clips = os.listdir(os.path.join(path_input, game))
@@ -60,8 +134,8 @@ def create_gt_labels(path_input, path_output, train_rate=0.7):
             labels_target = labels[2:]
             labels_target.loc[:, 'path2'] = list(labels['path1'][1:-1])
             labels_target.loc[:, 'path3'] = list(labels['path1'][:-2])
-            df = df.append(labels_target)
-    df = df.reset_index(drop=True) 
+            dfs.append(labels_target)
+    df = pd.concat(dfs).reset_index(drop=True)
     df = df[['path1', 'path2', 'path3', 'gt_path', 'x-coordinate', 'y-coordinate', 'status', 'visibility']]
     df = df.sample(frac=1)
     num_train = int(df.shape[0]*train_rate)
@@ -80,12 +154,18 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--path_input', type=str, help='path to input folder')
     parser.add_argument('--path_output', type=str, help='path to output folder')
+    parser.add_argument('--num_workers', type=int, default=None, help='number of processes for heatmap generation')
+    parser.add_argument('--slow', action='store_true', help='use the original pixel by pixel generator')
     args = parser.parse_args()
     
     if not os.path.exists(args.path_output):
         os.makedirs(args.path_output)
         
-    create_gt_images(args.path_input, args.path_output, SIZE, VARIANCE, WIDTH, HEIGHT)
+    if args.slow:
+        create_gt_images(args.path_input, args.path_output, SIZE, VARIANCE, WIDTH, HEIGHT)
+    else:
+        create_gt_images_fast(args.path_input, args.path_output, SIZE, VARIANCE, WIDTH, HEIGHT,
+                              args.num_workers)
     create_gt_labels(args.path_input, args.path_output)
 
                             
@@ -223,7 +223,7 @@ if __name__ == '__main__':
     model.eval()
     
     frames, fps = read_video(args.video_path)
-    ball_track, dists = infer_model(frames, model)
+    ball_track, dists = infer_model(frames, model, device)
     ball_track = remove_outliers(ball_track, dists)    
     
     if args.extrapolation:
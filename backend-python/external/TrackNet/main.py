@@ -1,6 +1,6 @@
 from model import BallTrackerNet
 import torch
-from datasets import trackNetDataset
+from datasets import trackNetDataset, trackNetMemmapDataset
 import torch.optim as optim
 import os
 from tensorboardX import SummaryWriter
@@ -11,6 +11,8 @@ if __name__ == '__main__':
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--batch_size', type=int, default=2, help='batch size')
+    parser.add_argument('--num_workers', type=int, default=1, help='number of data loading workers')
+    parser.add_argument('--memmap', action='store_true', help='use the dataset preprocessed by datasets.py')
     parser.add_argument('--exp_id', type=str, default='default', help='path to saving results')
     parser.add_argument('--num_epochs', type=int, default=500, help='total training epochs')
     parser.add_argument('--lr', type=float, default=1.0, help='learning rate')
@@ -18,21 +20,22 @@ if __name__ == '__main__':
     parser.add_argument('--steps_per_epoch', type=int, default=200, help='number of steps per one epoch')
     args = parser.parse_args()
     
-    train_dataset = trackNetDataset('train')
+    dataset_class = trackNetMemmapDataset if args.memmap else trackNetDataset
+    train_dataset = dataset_class('train')
     train_loader = torch.utils.data.DataLoader(
         train_dataset,
         batch_size=args.batch_size,
         shuffle=True,
-        num_workers=1,
+        num_workers=args.num_workers,
         pin_memory=True
     )
     
-    val_dataset = trackNetDataset('val')
+    val_dataset = dataset_class('val')
     val_loader = torch.utils.data.DataLoader(
         val_dataset,
         batch_size=args.batch_size,
         shuffle=False,
-        num_workers=1,
+        num_workers=args.num_workers,
         pin_memory=True
     )    
     
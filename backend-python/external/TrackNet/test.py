@@ -1,6 +1,6 @@
 from model import BallTrackerNet
 import torch
-from datasets import trackNetDataset
+from datasets import trackNetDataset, trackNetMemmapDataset
 from general import validate
 import argparse
 
@@ -8,15 +8,18 @@ if __name__ == '__main__':
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--batch_size', type=int, default=2, help='batch size')
+    parser.add_argument('--num_workers', type=int, default=1, help='number of data loading workers')
+    parser.add_argument('--memmap', action='store_true', help='use the dataset preprocessed by datasets.py')
     parser.add_argument('--model_path', type=str, help='path to model')
     args = parser.parse_args()
 
-    val_dataset = trackNetDataset('val')
+    dataset_class = trackNetMemmapDataset if args.memmap else trackNetDataset
+    val_dataset = dataset_class('val')
     val_loader = torch.utils.data.DataLoader(
         val_dataset,
         batch_size=args.batch_size,
         shuffle=False,
-        num_workers=1,
+        num_workers=args.num_workers,
         pin_memory=True
     )
 
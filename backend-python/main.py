@@ -3,8 +3,9 @@
 """Módulo principal de la API de análisis de vídeo con FastAPI y Celery.
 
 Este módulo expone un endpoint para subir vídeos, los encola en Celery
-para su procesamiento (detección y homografía) y notifica el resultado
-a un servicio Node.js.
+para su procesamiento (detección, homografía y estadísticas) y notifica el
+resultado a un servicio Node.js. Opcionalmente genera un vídeo anotado del
+partido en una tarea posterior.
 """
 
 # Importacion de librerias
@@ -22,6 +23,9 @@ from dotenv import load_dotenv
 
 from detection import video_analyzer
 from homography import transform_json_homography, rename_players_by_position
+from match_stats import compute_match_statistics
+from renderer import render_annotated_video
+from track_lod import LOD_LEVELS, build_levels_of_detail
 from utils import ui_to_frame_corners
 
 
@@ -37,13 +41,17 @@ except KeyError as missing:
 
 celery_app = Celery("tasks", broker=broker_url, backend=backend_url)
 
+# Configuracion del vídeo anotado (opcional)
+render_enabled = os.getenv("RENDER_ANNOTATED_VIDEO", "0") == "1"
+render_output_dir = os.getenv("RENDER_OUTPUT_DIR", "videos_results")
+
 
 # Creacion de la aplicacion FastAPI
 app = FastAPI()
 
 
 @celery_app.task(bind=True)
-def analyze_video_task(self, temp_file_path: str, src_corners: list, match_id: str):
+def analyze_video_task(self, temp_file_path: str, src_corners: list, match_id: str, lod_level: str = "native"):
     """
     Procesa un vídeo aplicando análisis de detección y transformación por homografía.
 
@@ -52,14 +60,20 @@ def analyze_video_task(self, temp_file_path: str, src_corners: list, match_id: s
         temp_file_path (str): Ruta al fichero de vídeo temporal.
         src_corners (List[List[float]]): Lista de 4 esquinas en coordenadas del frame.
         match_id (str): Identificador único del partido.
+        lod_level (str): Nivel de detalle de la trayectoria enviada a Node.js (clave de `LOD_LEVELS`).
+
+    Si `RENDER_ANNOTATED_VIDEO=1`, encola `render_video_task` con el vídeo y la
+    trayectoria completa, y el borrado del fichero temporal pasa a esa tarea.
 
     Returns:
-        dict: Resultado JSON tras aplicar homografía y renombrar jugadores.
+        dict: Resultado JSON tras aplicar homografía y renombrar jugadores, en el nivel
+            de detalle `lod_level` y con las estadísticas agregadas del partido en 'stats'.
 
     Raises:
         RuntimeError: Si ocurre un error en el análisis del vídeo.
         requests.RequestException: Si la notificación al servicio Node.js falla.
     """
+    keep_video = False
     try:
         start_time = time.time()
 
@@ -73,6 +87,14 @@ def analyze_video_task(self, temp_file_path: str, src_corners: list, match_id: s
         result_homography = transform_json_homography(results)
         result_homography = rename_players_by_position(result_homography)
 
+        # Calcular las estadísticas agregadas del partido sobre la trayectoria completa
+        stats = compute_match_statistics(result_homography)
+
+        # Generar los niveles de detalle y quedarnos con el solicitado
+        levels = build_levels_of_detail(result_homography)
+        native_result = levels["native"]
+        result_homography = {**levels[lod_level], "stats": stats}
+
         end_time = time.time()
         print(f"[Celery] Análisis completo en {end_time - start_time:.2f} segundos")
 
@@ -89,6 +111,11 @@ def analyze_video_task(self, temp_file_path: str, src_corners: list, match_id: s
         resp.raise_for_status()
         print(f"[Celery] Notificado a Node.js: {node_url})")
 
+        # Encolar el vídeo anotado, que se encarga de borrar el fichero temporal
+        if render_enabled:
+            render_video_task.apply_async(args=[temp_file_path, src_corners, native_result, match_id])
+            keep_video = True
+
         return result_homography
     
     except Exception as e:
@@ -97,7 +124,7 @@ def analyze_video_task(self, temp_file_path: str, src_corners: list, match_id: s
 
     finally:
         # Borrar el archivo temporal
-        if os.path.exists(temp_file_path):
+        if not keep_video and os.path.exists(temp_file_path):
             try:
                 os.remove(temp_file_path)
                 print(f"[Celery] Archivo temporal borrado: {temp_file_path}")
@@ -107,8 +134,48 @@ def analyze_video_task(self, temp_file_path: str, src_corners: list, match_id: s
     
 
 
+@celery_app.task(bind=True)
+def render_video_task(self, video_path: str, src_corners: list, result: dict, match_id: str):
+    """
+    Genera el vídeo anotado de un partido ya analizado y borra el vídeo temporal.
+
+    Args:
+        self: Referencia al contexto de la tarea Celery.
+        video_path (str): Ruta al fichero de vídeo temporal.
+        src_corners (List[List[float]]): Lista de 4 esquinas en coordenadas del frame.
+        result (dict): Resultado con la trayectoria completa en coordenadas de la pista.
+        match_id (str): Identificador único del partido.
+
+    Returns:
+        str: Ruta del vídeo anotado.
+
+    Raises:
+        RuntimeError: Si no se puede leer el vídeo o falla la codificación.
+    """
+    try:
+        start_time = time.time()
+        os.makedirs(render_output_dir, exist_ok=True)
+        output_path = os.path.join(render_output_dir, f"{match_id}.mp4")
+        render_annotated_video(video_path, result, src_corners, output_path)
+        print(f"[Celery] Vídeo anotado en {time.time() - start_time:.2f} segundos: {output_path}")
+        return output_path
+
+    except Exception as e:
+        print(f"[Celery] Error generando el vídeo anotado: {e}")
+        raise
+
+    finally:
+        # Borrar el archivo temporal
+        if os.path.exists(video_path):
+            try:
+                os.remove(video_path)
+                print(f"[Celery] Archivo temporal borrado: {video_path}")
+            except OSError as e:
+                print(f"[Celery] No se pudo borrar {video_path}: {e}")
+
+
 @app.post("/upload_video")
-async def upload_video(file: UploadFile = File(...), file_name: str = Form(...), corners: str = Form(...), display_width: float = Form(...), display_height: float = Form(...), match_id: str = Form(...)):
+async def upload_video(file: UploadFile = File(...), file_name: str = Form(...), corners: str = Form(...), display_width: float = Form(...), display_height: float = Form(...), match_id: str = Form(...), lod_level: str = Form("native")):
     """
     Recibe un vídeo, valida esquinas de UI, convierte coordenadas y lo encola en Celery.
 
@@ -119,14 +186,22 @@ async def upload_video(file: UploadFile = File(...), file_name: str = Form(...),
         display_width (float): Ancho en píxels de la vista previa.
         display_height (float): Alto en píxels de la vista previa.
         match_id (str): Identificador único del partido.
+        lod_level (str): Nivel de detalle del resultado ('native', '10hz' o '1hz').
 
     Returns:
         dict: Contiene `task_id` y `status` indicando que la tarea está encolada.
 
     Raises:
-        JSONResponse: Devuelve errores 400 si el JSON de esquinas es inválido o la conversión de coordenadas falla.
+        JSONResponse: Devuelve errores 400 si el nivel de detalle o el JSON de esquinas es inválido o la conversión de coordenadas falla.
     """
 
+    # Verificar el nivel de detalle solicitado
+    if lod_level not in LOD_LEVELS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"El campo 'lod_level' debe ser uno de {list(LOD_LEVELS)}"}
+        )
+
     # Verificar y crear la carpeta temp si no existe
     os.makedirs("temp", exist_ok=True)
 
@@ -160,7 +235,7 @@ async def upload_video(file: UploadFile = File(...), file_name: str = Form(...),
 
     # Mandar la tarea de análisis al worker de Celery
     task = analyze_video_task.apply_async(
-        args=[temp_path, src_corners.tolist(), match_id]
+        args=[temp_path, src_corners.tolist(), match_id, lod_level]
     )
 
     # Retornar el ID de la tarea y el estado
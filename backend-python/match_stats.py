@@ -0,0 +1,222 @@
+# match_stats.py
+
+"""
+Módulo de estadísticas del partido calculadas con NumPy sobre las trayectorias
+en coordenadas reales de la pista (tras homografía y renombrado de jugadores).
+
+Genera los mismos agregados que antes se calculaban con consultas Flux en
+Node (distancias, velocidades medias y máximas, heatmap) junto con perfiles de
+velocidad por segundo y los botes de la bola.
+"""
+
+import numpy as np
+
+
+def track_to_arrays(frames, key=None):
+    """
+    Convierte la trayectoria de una entidad a arrays de NumPy.
+
+    Args:
+        frames (List[dict]): Lista de frames con 'players' y 'ball'.
+        key (str | None): Clave del jugador, o None para la bola.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - Índices de los frames con posición válida.
+            - Array de forma (N, 2) con las posiciones (x, y) válidas.
+            - Array con el valor de 'bote' de cada posición válida (ceros para jugadores).
+    """
+    n = len(frames)
+    xy = np.full((n, 2), -1.0)
+    bote = np.zeros(n, dtype=int)
+    for i, frame in enumerate(frames):
+        pos = frame["ball"] if key is None else frame["players"].get(key)
+        if pos:
+            xy[i] = (pos["x"], pos["y"])
+            if key is None:
+                bote[i] = pos.get("bote", 0)
+
+    valid = np.flatnonzero((xy[:, 0] != -1) & (xy[:, 1] != -1))
+    return valid, xy[valid], bote[valid]
+
+
+def step_speeds(idx, xy, fps):
+    """
+    Calcula la distancia y velocidad entre posiciones válidas consecutivas.
+
+    Args:
+        idx (np.ndarray): Índices de frame de las posiciones.
+        xy (np.ndarray): Array de forma (N, 2) con las posiciones.
+        fps (float): Fotogramas por segundo.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - Índice de frame del final de cada paso.
+            - Distancia recorrida en cada paso (m).
+            - Velocidad de cada paso (m/s).
+    """
+    if len(idx) < 2:
+        empty = np.zeros(0)
+        return idx[:0], empty, empty
+    dist = np.hypot(*np.diff(xy, axis=0).T)
+    elapsed = np.diff(idx) / fps
+    return idx[1:], dist, dist / elapsed
+
+
+def speed_per_second(frame_idx, speeds, fps, num_seconds):
+    """
+    Promedia las velocidades de cada paso en ventanas de un segundo.
+
+    Args:
+        frame_idx (np.ndarray): Índice de frame de cada velocidad.
+        speeds (np.ndarray): Velocidades de cada paso (m/s).
+        fps (float): Fotogramas por segundo.
+        num_seconds (int): Número de segundos del vídeo.
+
+    Returns:
+        np.ndarray: Velocidad media de cada segundo (NaN si no hay datos).
+    """
+    second = (frame_idx // fps).astype(int)
+    sums = np.bincount(second, weights=speeds, minlength=num_seconds)
+    counts = np.bincount(second, minlength=num_seconds)
+    profile = np.full(len(sums), np.nan)
+    np.divide(sums, counts, out=profile, where=counts > 0)
+    return profile
+
+
+def profile_to_list(profile):
+    """
+    Convierte un perfil de velocidad a lista serializable en JSON.
+
+    Args:
+        profile (np.ndarray): Velocidades por segundo con NaN donde no hay datos.
+
+    Returns:
+        List[float | None]: Velocidades redondeadas a 2 decimales o None.
+    """
+    return [None if np.isnan(v) else round(float(v), 2) for v in profile]
+
+
+def max_of_profile(profile):
+    """
+    Devuelve el máximo de un perfil de velocidad ignorando los segundos sin datos.
+
+    Args:
+        profile (np.ndarray): Velocidades por segundo con NaN donde no hay datos.
+
+    Returns:
+        float: Velocidad máxima o 0.0 si el perfil está vacío.
+    """
+    if len(profile) == 0 or np.all(np.isnan(profile)):
+        return 0.0
+    return float(np.nanmax(profile))
+
+
+def player_heatmap(pid, xy, cell_size, court_width, court_length):
+    """
+    Cuenta las posiciones de un jugador en cada celda de la pista.
+
+    Args:
+        pid (str): Etiqueta del jugador ('top_left', 'bottom_right', ...).
+        xy (np.ndarray): Array de forma (N, 2) con las posiciones válidas.
+        cell_size (float): Tamaño de celda en metros.
+        court_width (float): Ancho real de la pista.
+        court_length (float): Largo real de la pista.
+
+    Returns:
+        List[dict]: Celdas con 'row', 'col' y 'value' (número de frames).
+    """
+    x, y = xy[:, 0], xy[:, 1]
+    # Ignorar fuera de pista y posiciones en el campo contrario (errores de medición)
+    mask = (x >= 0) & (x < court_width) & (y >= 0) & (y < court_length)
+    if pid.startswith("bottom"):
+        mask &= y >= court_length / 2
+    elif pid.startswith("top"):
+        mask &= y <= court_length / 2
+
+    cols = np.floor(x[mask] / cell_size).astype(int)
+    rows = np.floor(y[mask] / cell_size).astype(int)
+    n_cols = int(np.ceil(court_width / cell_size))
+    cells, counts = np.unique(rows * n_cols + cols, return_counts=True)
+    return [
+        {"row": int(c // n_cols), "col": int(c % n_cols), "value": int(v)}
+        for c, v in zip(cells, counts)
+    ]
+
+
+def compute_match_statistics(data, cell_size=0.25, court_width=10, court_length=20,
+                             max_player_speed=9.0, max_ball_speed=35.0, max_ball_outlier=40.0, max_ball_step=1.0):
+    """
+    Calcula las estadísticas agregadas del partido a partir de la trayectoria transformada.
+
+    Args:
+        data (dict): Resultado de `rename_players_by_position` con 'fps' y 'frames'.
+        cell_size (float): Tamaño de celda del heatmap en metros.
+        court_width (float): Ancho real de la pista.
+        court_length (float): Largo real de la pista.
+        max_player_speed (float): Velocidad máxima admitida para un jugador (m/s).
+        max_ball_speed (float): Velocidad máxima admitida para la bola (m/s).
+        max_ball_outlier (float): Velocidad de la bola a partir de la cual el paso se descarta.
+        max_ball_step (float): Distancia máxima de un paso de la bola para sumarse a la distancia total.
+
+    Returns:
+        dict: Estadísticas con:
+            - 'distances', 'avgSpeeds', 'maxSpeeds': por jugador y 'ball'.
+            - 'speedProfiles': velocidad media de cada segundo por jugador y 'ball'.
+            - 'heatmap': dict con 'cell_size' y celdas por jugador.
+            - 'bounces': lista de botes con 'frame', 'time', 'x' e 'y'.
+
+    Raises:
+        ValueError: Si 'fps' no es un valor positivo.
+    """
+    fps = float(data.get("fps", -1))
+    if fps <= 0:
+        raise ValueError("El resultado no contiene un valor de 'fps' válido.")
+
+    frames = data["frames"]
+    num_seconds = int(np.ceil(len(frames) / fps))
+    player_ids = sorted({pid for frame in frames for pid in frame["players"]})
+
+    distances, avg_speeds, max_speeds, profiles = {}, {}, {}, {}
+    heatmap = {}
+
+    # Duración del partido según la primera y última detección de la bola
+    ball_idx, ball_xy, ball_bote = track_to_arrays(frames)
+    duration = (ball_idx[-1] - ball_idx[0]) / fps if len(ball_idx) > 1 else 0.0
+
+    # Jugadores
+    for pid in player_ids:
+        idx, xy, _ = track_to_arrays(frames, pid)
+        step_idx, dist, speed = step_speeds(idx, xy, fps)
+        profile = speed_per_second(step_idx, np.minimum(speed, max_player_speed), fps, num_seconds)
+
+        distances[pid] = float(dist.sum())
+        avg_speeds[pid] = round(distances[pid] / duration, 2) if duration > 0 else 0.0
+        max_speeds[pid] = max_of_profile(profile)
+        profiles[pid] = profile_to_list(profile)
+        heatmap[pid] = player_heatmap(pid, xy, cell_size, court_width, court_length)
+
+    # Bola
+    step_idx, dist, speed = step_speeds(ball_idx, ball_xy, fps)
+    keep = speed <= max_ball_outlier
+    profile = speed_per_second(step_idx[keep], np.minimum(speed[keep], max_ball_speed), fps, num_seconds)
+
+    distances["ball"] = float(dist[dist <= max_ball_step].sum())
+    avg_speeds["ball"] = round(distances["ball"] / duration, 2) if duration > 0 else 0.0
+    max_speeds["ball"] = max_of_profile(profile)
+    profiles["ball"] = profile_to_list(profile)
+
+    bounces = [
+        {"frame": int(i), "time": round(i / fps, 3), "x": float(x), "y": float(y)}
+        for i, (x, y) in zip(ball_idx[ball_bote == 1], ball_xy[ball_bote == 1])
+    ]
+
+    print("[compute_match_statistics] Estadísticas calculadas.")
+    return {
+        "distances": distances,
+        "avgSpeeds": avg_speeds,
+        "maxSpeeds": max_speeds,
+        "speedProfiles": profiles,
+        "heatmap": {"cell_size": cell_size, "heatmap": heatmap},
+        "bounces": bounces,
+    }
@@ -0,0 +1,228 @@
+# renderer.py
+
+"""
+Módulo para generar vídeos de revisión anotados con jugadores, trayectoria de la bola,
+botes y un minimapa de la pista.
+
+Los frames se leen del vídeo original uno a uno y se envían a un proceso de ffmpeg
+que los codifica en H.264, de forma que el uso de memoria no depende de la
+duración del vídeo.
+"""
+
+import os
+import subprocess
+from collections import deque
+
+import cv2
+import numpy as np
+
+from homography import order_points
+
+
+# Colores (BGR) de cada jugador
+PLAYER_COLORS = {
+    "top_left": (255, 128, 0),
+    "top_right": (0, 200, 255),
+    "bottom_left": (255, 0, 255),
+    "bottom_right": (0, 255, 0),
+}
+BALL_COLOR = (0, 0, 255)
+BOUNCE_COLOR = (0, 255, 255)
+
+
+def court_to_image_homography(court_corners, court_width=10, court_length=20):
+    """
+    Calcula la homografía que lleva coordenadas reales de la pista al frame del vídeo.
+
+    Args:
+        court_corners (List[List[float]]): Cuatro esquinas de la pista en coordenadas del frame.
+        court_width (float): Ancho real de la pista.
+        court_length (float): Largo real de la pista.
+
+    Returns:
+        np.ndarray: Matriz de homografía de forma (3, 3).
+    """
+    src_points = np.array([
+        [0, 0],
+        [court_width, 0],
+        [court_width, court_length],
+        [0, court_length]
+    ], dtype="float32")
+    dst_points = order_points(court_corners)
+    H, status = cv2.findHomography(src_points, dst_points)
+    return H
+
+
+def project_point(pos, H):
+    """
+    Proyecta una posición de la pista al frame del vídeo.
+
+    Args:
+        pos (dict): Posición con 'x' e 'y' en metros (-1 si no es válida).
+        H (np.ndarray): Homografía pista -> frame.
+
+    Returns:
+        Tuple[int, int] | None: Punto en píxeles o None si la posición no es válida.
+    """
+    if pos is None or pos["x"] == -1 or pos["y"] == -1:
+        return None
+    p = H.dot(np.array([pos["x"], pos["y"], 1.0]))
+    return int(p[0] / p[2]), int(p[1] / p[2])
+
+
+def open_h264_writer(output_path, width, height, fps, ffmpeg_path="ffmpeg", crf=23, preset="veryfast"):
+    """
+    Lanza un proceso de ffmpeg que codifica en H.264 los frames BGR recibidos por stdin.
+
+    Args:
+        output_path (str): Ruta del vídeo de salida (.mp4).
+        width (int): Ancho de los frames.
+        height (int): Alto de los frames.
+        fps (float): Fotogramas por segundo.
+        ffmpeg_path (str): Ruta al ejecutable de ffmpeg.
+        crf (int): Calidad constante de x264 (menor es mejor calidad).
+        preset (str): Preset de velocidad de x264.
+
+    Returns:
+        subprocess.Popen: Proceso de ffmpeg con stdin abierto.
+
+    Raises:
+        FileNotFoundError: Si no se encuentra el ejecutable de ffmpeg.
+    """
+    cmd = [
+        ffmpeg_path, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "bgr24",
+        "-s", f"{width}x{height}", "-r", str(fps),
+        "-i", "-",
+        "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+        "-pix_fmt", "yuv420p", "-movflags", "+faststart",
+        output_path,
+    ]
+    return subprocess.Popen(cmd, stdin=subprocess.PIPE)
+
+
+def draw_minimap(frame, frame_data, bounces, scale=10, margin=10, court_width=10, court_length=20):
+    """
+    Dibuja un minimapa de la pista en la esquina superior derecha del frame.
+
+    Args:
+        frame (np.ndarray): Frame BGR donde se dibuja (se modifica).
+        frame_data (dict): Frame del resultado con 'players' y 'ball' en metros.
+        bounces (Iterable[Tuple[float, float]]): Botes recientes en metros.
+        scale (int): Píxeles por metro del minimapa.
+        margin (int): Separación con el borde del frame en píxeles.
+        court_width (float): Ancho real de la pista.
+        court_length (float): Largo real de la pista.
+    """
+    w, h = int(court_width * scale), int(court_length * scale)
+    x0, y0 = frame.shape[1] - w - margin, margin
+    if x0 < 0 or y0 + h > frame.shape[0]:
+        return
+
+    # Fondo semitransparente, líneas de la pista y red
+    roi = frame[y0:y0 + h, x0:x0 + w]
+    cv2.addWeighted(roi, 0.4, np.full_like(roi, (80, 60, 20)), 0.6, 0, dst=roi)
+    cv2.rectangle(frame, (x0, y0), (x0 + w - 1, y0 + h - 1), (255, 255, 255), 1)
+    cv2.line(frame, (x0, y0 + h // 2), (x0 + w - 1, y0 + h // 2), (255, 255, 255), 2)
+
+    def to_map(pos):
+        return int(x0 + pos[0] * scale), int(y0 + pos[1] * scale)
+
+    for bx, by in bounces:
+        cv2.drawMarker(frame, to_map((bx, by)), BOUNCE_COLOR, cv2.MARKER_TILTED_CROSS, 8, 2)
+    for pid, pos in frame_data["players"].items():
+        if pos["x"] != -1 and pos["y"] != -1:
+            cv2.circle(frame, to_map((pos["x"], pos["y"])), 5, PLAYER_COLORS.get(pid, (255, 255, 255)), -1)
+    ball = frame_data["ball"]
+    if ball["x"] != -1 and ball["y"] != -1:
+        cv2.circle(frame, to_map((ball["x"], ball["y"])), 3, BALL_COLOR, -1)
+
+
+def render_annotated_video(video_path, result, court_corners, output_path, trace=7, bounce_seconds=1.0,
+                           minimap=True, ffmpeg_path=None):
+    """
+    Genera un vídeo H.264 anotado a partir del vídeo original y del resultado del análisis.
+
+    Args:
+        video_path (str): Ruta al vídeo original.
+        result (dict): Resultado de `rename_players_by_position` (un frame por frame del vídeo).
+        court_corners (List[List[float]]): Cuatro esquinas de la pista en coordenadas del frame.
+        output_path (str): Ruta del vídeo de salida (.mp4).
+        trace (int): Número de frames de la estela de la bola.
+        bounce_seconds (float): Segundos que se mantiene visible cada bote.
+        minimap (bool): Si se dibuja el minimapa de la pista.
+        ffmpeg_path (str | None): Ruta a ffmpeg (por defecto la variable `FFMPEG_PATH` o 'ffmpeg').
+
+    Returns:
+        int: Número de frames escritos.
+
+    Raises:
+        RuntimeError: Si no se puede abrir el vídeo o ffmpeg termina con error.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f"No se pudo abrir el vídeo {video_path}.")
+    fps = cap.get(cv2.CAP_PROP_FPS) or result.get("fps", 30)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    H = court_to_image_homography(court_corners)
+    frames = result["frames"]
+    ball_trace = deque(maxlen=trace)
+    bounces = deque()
+    bounce_frames = int(bounce_seconds * fps)
+
+    ffmpeg_path = ffmpeg_path or os.getenv("FFMPEG_PATH", "ffmpeg")
+    writer = open_h264_writer(output_path, width, height, fps, ffmpeg_path)
+    idx = 0
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            if idx < len(frames):
+                frame_data = frames[idx]
+
+                # Jugadores
+                for pid, pos in frame_data["players"].items():
+                    pt = project_point(pos, H)
+                    if pt is not None:
+                        color = PLAYER_COLORS.get(pid, (255, 255, 255))
+                        cv2.ellipse(frame, pt, (22, 8), 0, 0, 360, color, 2)
+                        cv2.putText(frame, pid, (pt[0] - 30, pt[1] + 24), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1,
+                                    cv2.LINE_AA)
+
+                # Estela de la bola
+                ball = frame_data["ball"]
+                ball_trace.append(project_point(ball, H))
+                for i, pt in enumerate(reversed(ball_trace)):
+                    if pt is None:
+                        break
+                    cv2.circle(frame, pt, radius=0, color=BALL_COLOR, thickness=max(10 - i, 1))
+
+                # Botes recientes
+                if ball.get("bote", 0) == 1:
+                    bounces.append((idx, ball["x"], ball["y"], project_point(ball, H)))
+                while bounces and idx - bounces[0][0] > bounce_frames:
+                    bounces.popleft()
+                for _, _, _, pt in bounces:
+                    cv2.drawMarker(frame, pt, BOUNCE_COLOR, cv2.MARKER_TILTED_CROSS, 20, 3)
+
+                if minimap:
+                    draw_minimap(frame, frame_data, [(bx, by) for _, bx, by, _ in bounces])
+
+            writer.stdin.write(frame.tobytes())
+            idx += 1
+    except BrokenPipeError:
+        pass
+    finally:
+        cap.release()
+        writer.stdin.close()
+        returncode = writer.wait()
+
+    if returncode != 0:
+        raise RuntimeError(f"ffmpeg terminó con código {returncode} al generar {output_path}.")
+
+    print(f"[render_annotated_video] Vídeo anotado guardado en {output_path} ({idx} frames).")
+    return idx
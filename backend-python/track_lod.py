@@ -0,0 +1,170 @@
+# track_lod.py
+
+"""
+Módulo para generar niveles de detalle (LOD) de la trayectoria del partido.
+
+Cada nivel promedia las posiciones de jugadores y bola en bloques de frames
+para reducir el volumen de datos enviados a Node.js, InfluxDB y al reproductor.
+Los frames con bote se conservan siempre como entradas propias con su posición
+exacta.
+"""
+
+import numpy as np
+
+
+# Niveles de detalle disponibles: nombre -> frecuencia objetivo (None = fps original)
+LOD_LEVELS = {
+    "native": None,
+    "10hz": 10,
+    "1hz": 1,
+}
+
+
+def segment_starts(num_frames, factor, bounce_idx):
+    """
+    Calcula el inicio de cada bloque de frames a promediar.
+
+    Los bloques tienen `factor` frames y se cortan en cada bote para que
+    el frame del bote forme un bloque propio.
+
+    Args:
+        num_frames (int): Número de frames de la trayectoria.
+        factor (int): Número de frames por bloque.
+        bounce_idx (np.ndarray): Índices de los frames con bote.
+
+    Returns:
+        np.ndarray: Índices ordenados del primer frame de cada bloque.
+    """
+    starts = np.concatenate([np.arange(0, num_frames, factor), bounce_idx, bounce_idx + 1])
+    return np.unique(starts[starts < num_frames])
+
+
+def segment_mean(values, starts):
+    """
+    Promedia las posiciones válidas de cada bloque.
+
+    Args:
+        values (np.ndarray): Array de forma (N, 2) con NaN en las posiciones inválidas.
+        starts (np.ndarray): Inicio de cada bloque.
+
+    Returns:
+        np.ndarray: Array de forma (len(starts), 2) con la media de cada bloque
+                    (NaN si el bloque no tiene posiciones válidas).
+    """
+    valid = ~np.isnan(values[:, 0])
+    sums = np.add.reduceat(np.where(valid[:, None], values, 0.0), starts, axis=0)
+    counts = np.add.reduceat(valid.astype(int), starts)
+    means = np.full(sums.shape, np.nan)
+    np.divide(sums, counts[:, None], out=means, where=counts[:, None] > 0)
+    return means
+
+
+def to_position(xy):
+    """
+    Convierte una posición media a formato JSON usando -1 si no es válida.
+
+    Args:
+        xy (np.ndarray): Par (x, y), con NaN si no hay posición.
+
+    Returns:
+        dict: Diccionario con 'x' e 'y'.
+    """
+    if np.isnan(xy[0]):
+        return {"x": -1, "y": -1}
+    return {"x": float(xy[0]), "y": float(xy[1])}
+
+
+def downsample_track(data, target_fps):
+    """
+    Reduce la frecuencia de una trayectoria promediando bloques de frames sin perder botes.
+
+    Args:
+        data (dict): Resultado de `rename_players_by_position` con 'fps' y 'frames'.
+        target_fps (float): Frecuencia objetivo en frames por segundo.
+
+    Returns:
+        dict: Nuevo diccionario con:
+            - 'fps': frecuencia del nivel.
+            - 'source_fps': fotogramas por segundo del vídeo original.
+            - 'court_corners_trans': copiado del input.
+            - 'frames': lista de frames con 'frame' (índice del primer frame original
+                        del bloque), 'players' y 'ball'.
+
+    Raises:
+        ValueError: Si 'fps' o `target_fps` no son valores positivos.
+    """
+    fps = data.get("fps", -1)
+    if fps <= 0 or target_fps <= 0:
+        raise ValueError("Se necesita un 'fps' y una frecuencia objetivo positivos.")
+
+    frames = data["frames"]
+    n = len(frames)
+    factor = max(int(round(fps / target_fps)), 1)
+    player_ids = sorted({pid for frame in frames for pid in frame["players"]})
+
+    # Pasar la trayectoria a arrays con NaN en las posiciones inválidas
+    players = np.full((len(player_ids), n, 2), np.nan)
+    ball = np.full((n, 2), np.nan)
+    bote = np.zeros(n, dtype=int)
+    for i, frame in enumerate(frames):
+        for p, pid in enumerate(player_ids):
+            pos = frame["players"].get(pid)
+            if pos and pos["x"] != -1 and pos["y"] != -1:
+                players[p, i] = (pos["x"], pos["y"])
+        b = frame["ball"]
+        if b["x"] != -1 and b["y"] != -1:
+            ball[i] = (b["x"], b["y"])
+            bote[i] = b.get("bote", 0)
+
+    bounce_idx = np.flatnonzero(bote == 1)
+    starts = segment_starts(n, factor, bounce_idx) if n else np.zeros(0, dtype=int)
+    player_means = [segment_mean(players[p], starts) for p in range(len(player_ids))] if n else []
+    ball_means = segment_mean(ball, starts) if n else np.zeros((0, 2))
+    is_bounce = np.isin(starts, bounce_idx)
+
+    new_data = {
+        "fps": fps / factor,
+        "source_fps": fps,
+        "court_corners_trans": data.get("court_corners_trans", []),
+        "frames": []
+    }
+
+    for s, start in enumerate(starts):
+        new_frame = {
+            "frame": int(start),
+            "players": {pid: to_position(player_means[p][s]) for p, pid in enumerate(player_ids)},
+        }
+        if is_bounce[s]:
+            # Los botes forman un bloque de un frame: posición exacta
+            new_frame["ball"] = {**to_position(ball_means[s]), "bote": 1}
+        elif np.isnan(ball_means[s, 0]):
+            new_frame["ball"] = {"x": -1, "y": -1, "bote": -1}
+        else:
+            new_frame["ball"] = {**to_position(ball_means[s]), "bote": 0}
+        new_data["frames"].append(new_frame)
+
+    return new_data
+
+
+def build_levels_of_detail(data, levels=None):
+    """
+    Genera varios niveles de detalle de una trayectoria.
+
+    Args:
+        data (dict): Resultado de `rename_players_by_position` con 'fps' y 'frames'.
+        levels (dict | None): Nombre del nivel -> frecuencia objetivo (None para el
+                              fps original). Por defecto `LOD_LEVELS`.
+
+    Returns:
+        dict: Nombre del nivel -> trayectoria con el formato de `downsample_track`.
+              El nivel original se devuelve sin modificar.
+    """
+    levels = LOD_LEVELS if levels is None else levels
+    result = {}
+    for name, target_fps in levels.items():
+        if target_fps is None or target_fps >= data.get("fps", -1):
+            result[name] = data
+        else:
+            result[name] = downsample_track(data, target_fps)
+        print(f"[build_levels_of_detail] Nivel '{name}': {len(result[name]['frames'])} frames.")
+    return result